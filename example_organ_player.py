@@ -7,18 +7,31 @@ negative for notes below C3.
 """
 
 import argparse
-import time
-from typing import Iterable, List, Sequence, Tuple, Optional
+import heapq
+import math
+import threading
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, Deque, Iterable, List, Sequence, Tuple, Optional
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
 
 from miditones import Midi
 from miditones.tone import Tone
 from pipe_organ_interface import PipeOrgan
+from playback_timing import enable_realtime, monotonic, sleep_until
 
 # MIDI note 48 is C3. Valve 0 maps to this note; other valves are offset from it.
 BASE_MIDI_FOR_VALVE_ZERO = 48
 
 
 Event = Tuple[float, bool, int, Tone, str]
+# Column layout used when numpy is available: times, is_open, valve_idx, tones, track_names.
+ValveSchedule = Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]
 
 
 def midi_note_to_valve_index(midi_note: int, base_note: int = BASE_MIDI_FOR_VALVE_ZERO) -> int:
@@ -26,6 +39,129 @@ def midi_note_to_valve_index(midi_note: int, base_note: int = BASE_MIDI_FOR_VALV
     return midi_note - base_note
 
 
+def _event_order(event: Event) -> Tuple[float, bool, int]:
+    """Sort key: by time; open events before close events if simultaneous to avoid spurious closures."""
+    return event[0], not event[1], event[2]
+
+
+def _groups_before(
+    track: Iterable[Sequence[Tone]], stop_time_limit: Optional[float], speed: float
+) -> Iterable[Sequence[Tone]]:
+    """Skip tone groups starting at or after the stop limit when the track supports slicing."""
+    if stop_time_limit is None or not hasattr(track, "slice"):
+        return track
+    # Groups starting before the start limit may still sound into the window, so keep them.
+    # The bound is padded by one ulp: a group whose start divides back to exactly the
+    # limit must reach the caller's own (start / speed) check rather than be cut here.
+    return track.slice(stop_time=math.nextafter(stop_time_limit * speed, math.inf))
+
+
+def _valve_command_times(
+    tone: Tone,
+    turn_on_delay: float,
+    turn_off_delay: float,
+    speed: float,
+    start_time_limit: float,
+    stop_time_limit: Optional[float],
+) -> Optional[Tuple[float, float]]:
+    """Return (open_time, close_time) for a tone, or None if it lies outside the window."""
+    # Scale timeline by speed; durations rely on integer ticks for consistency.
+    tick_seconds = tone.duration / tone.duration_ticks if tone.duration_ticks else tone.duration
+    start_time = tone.start_time / speed
+    duration = (tone.duration_ticks * tick_seconds) / speed if tone.duration_ticks else tone.duration / speed
+
+    original_end = start_time + duration
+    if stop_time_limit is not None and start_time >= stop_time_limit:
+        return None
+    if original_end <= start_time_limit:
+        return None
+
+    clipped_start = max(start_time, start_time_limit)
+    clipped_end = original_end if stop_time_limit is None else min(original_end, stop_time_limit)
+    if clipped_end <= clipped_start:
+        return None
+
+    relative_start = clipped_start - start_time_limit
+    relative_end = clipped_end - start_time_limit
+
+    start_cmd_time = max(0.0, relative_start - turn_on_delay)
+    end_cmd_time = max(0.0, relative_end - turn_off_delay)
+    return start_cmd_time, end_cmd_time
+
+
+def build_valve_schedule(
+    track: Iterable[Sequence[Tone]],
+    turn_on_delay: float,
+    turn_off_delay: float,
+    speed: float,
+    start_time_limit: float,
+    stop_time_limit: Optional[float],
+) -> ValveSchedule:
+    """Translate tones into unsorted valve event columns (requires numpy).
+
+    Returns parallel arrays ``(times, is_open, valve_idx, tones, track_names)``
+    holding one open and one close event per tone; `schedule_to_events` orders
+    them and converts them to event tuples.
+    """
+    track_name = track.name if hasattr(track, "name") else ""
+    tones = [tone for tone_group in _groups_before(track, stop_time_limit, speed) for tone in tone_group]
+    count = len(tones)
+
+    start_times = np.fromiter((tone.start_time for tone in tones), dtype=np.float64, count=count)
+    durations = np.fromiter((tone.duration for tone in tones), dtype=np.float64, count=count)
+    duration_ticks = np.fromiter((tone.duration_ticks for tone in tones), dtype=np.int64, count=count)
+    midi_notes = np.fromiter((tone.midi_note for tone in tones), dtype=np.int16, count=count)
+
+    # Same arithmetic as _valve_command_times, applied to every tone at once.
+    has_ticks = duration_ticks != 0
+    tick_seconds = np.divide(durations, duration_ticks, out=durations.copy(), where=has_ticks)
+    start = start_times / speed
+    duration = np.where(has_ticks, (duration_ticks * tick_seconds) / speed, durations / speed)
+    original_end = start + duration
+
+    valid = original_end > start_time_limit
+    clipped_start = np.maximum(start, start_time_limit)
+    if stop_time_limit is None:
+        clipped_end = original_end
+    else:
+        valid &= start < stop_time_limit
+        clipped_end = np.minimum(original_end, stop_time_limit)
+    valid &= clipped_end > clipped_start
+
+    start_cmd = np.maximum(0.0, (clipped_start[valid] - start_time_limit) - turn_on_delay)
+    end_cmd = np.maximum(0.0, (clipped_end[valid] - start_time_limit) - turn_off_delay)
+    valves = midi_note_to_valve_index(midi_notes[valid])
+    kept = np.empty(count, dtype=object)
+    kept[:] = tones
+    kept = kept[valid]
+
+    # Interleave so each tone contributes an open event followed by its close event.
+    size = 2 * len(kept)
+    times = np.empty(size, dtype=np.float64)
+    times[0::2] = start_cmd
+    times[1::2] = end_cmd
+    is_open = np.zeros(size, dtype=np.bool_)
+    is_open[0::2] = True
+    valve_idx = np.repeat(valves, 2)
+    event_tones = np.repeat(kept, 2)
+    track_names = np.full(size, track_name, dtype=object)
+    return times, is_open, valve_idx, event_tones, track_names
+
+
+def schedule_to_events(schedule: ValveSchedule) -> List[Event]:
+    """Order a valve schedule and convert it to event tuples."""
+    times, is_open, valve_idx, tones, track_names = schedule
+    # Sort by time; open events before close events if simultaneous to avoid spurious closures.
+    order = np.lexsort((valve_idx, ~is_open, times))
+    return list(zip(
+        times[order].tolist(),
+        is_open[order].tolist(),
+        valve_idx[order].tolist(),
+        tones[order].tolist(),
+        track_names[order].tolist(),
+    ))
+
+
 def build_valve_events(
     track: Iterable[Sequence[Tone]],
     turn_on_delay: float,
@@ -40,69 +176,127 @@ def build_valve_events(
     - An open event scheduled `turn_on_delay` before the intended start.
     - A close event scheduled `turn_off_delay` before the intended end.
     """
+    if np is not None:
+        return schedule_to_events(build_valve_schedule(
+            track, turn_on_delay, turn_off_delay, speed, start_time_limit, stop_time_limit
+        ))
+
     events: List[Event] = []
+    track_name = track.name if hasattr(track, "name") else ""
 
-    for tone_group in track:
+    for tone_group in _groups_before(track, stop_time_limit, speed):
         for tone in tone_group:
-            # Scale timeline by speed; durations rely on integer ticks for consistency.
-            tick_seconds = tone.duration / tone.duration_ticks if tone.duration_ticks else tone.duration
-            start_time = tone.start_time / speed
-            duration = (tone.duration_ticks * tick_seconds) / speed if tone.duration_ticks else tone.duration / speed
-
-            original_end = start_time + duration
-            if stop_time_limit is not None and start_time >= stop_time_limit:
-                continue
-            if original_end <= start_time_limit:
-                continue
-
-            clipped_start = max(start_time, start_time_limit)
-            clipped_end = original_end if stop_time_limit is None else min(original_end, stop_time_limit)
-            if clipped_end <= clipped_start:
+            window = _valve_command_times(
+                tone, turn_on_delay, turn_off_delay, speed, start_time_limit, stop_time_limit
+            )
+            if window is None:
                 continue
-
-            relative_start = clipped_start - start_time_limit
-            relative_end = clipped_end - start_time_limit
-
-            start_cmd_time = max(0.0, relative_start - turn_on_delay)
-            end_cmd_time = max(0.0, relative_end - turn_off_delay)
             valve_index = midi_note_to_valve_index(tone.midi_note)
-            events.append((start_cmd_time, True, valve_index, tone, track.name if hasattr(track, "name") else ""))
-            events.append((end_cmd_time, False, valve_index, tone, track.name if hasattr(track, "name") else ""))
+            events.append((window[0], True, valve_index, tone, track_name))
+            events.append((window[1], False, valve_index, tone, track_name))
 
     # Sort by time; open events before close events if simultaneous to avoid spurious closures.
-    events.sort(key=lambda e: (e[0], not e[1], e[2]))
+    events.sort(key=_event_order)
     return events
 
 
-def play_events(events: List[Event], organ: PipeOrgan) -> None:
-    """Execute valve events with monotonic timing for accuracy."""
-    open_valves = set()
-    start = time.monotonic()
-
-    for event_time, is_open, valve_index, tone, track_name in events:
-        elapsed = time.monotonic() - start
-        sleep_time = event_time - elapsed
-        if sleep_time > 0:
-            time.sleep(sleep_time)
-
-        if is_open:
-            if valve_index not in open_valves:
-                organ.valve_open(valve_index)
-                now_s = time.monotonic() - start
-                print(
-                    f"ON t={now_s:8.3f}s |  tick={tone.start_tick:6d} | "
-                    f"valve={valve_index:3d} | duration={tone.duration_ticks:3d} |  note={tone.note_full:>4s} | "
-                    f"freq={tone.frequency:8.2f} Hz | track={track_name} "
-                )
-                open_valves.add(valve_index)
-        else:
-            if valve_index in open_valves:
-                organ.valve_close(valve_index)
-                open_valves.discard(valve_index)
+class _EventLog:
+    """Prints valve-open events from a background thread.
+
+    The playback loop only appends raw tuples to a deque; formatting and stdout
+    writes happen off the timing-critical path.
+    """
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.queue: Deque[Tuple[float, int, Tone, str]] = deque()
+        self._interval = interval
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the printer after flushing everything queued so far."""
+        self._done.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._done.wait(self._interval):
+            self._drain()
+        self._drain()
+
+    def _drain(self) -> None:
+        queue = self.queue
+        while queue:
+            event_time, valve_index, tone, track_name = queue.popleft()
+            print(
+                f"ON t={event_time:8.3f}s |  tick={tone.start_tick:6d} | "
+                f"valve={valve_index:3d} | duration={tone.duration_ticks:3d} |  note={tone.note_full:>4s} | "
+                f"freq={tone.frequency:8.2f} Hz | track={track_name} "
+            )
+
+
+def play_events(events: List[Event], organ: PipeOrgan, verbose: bool = True, realtime: bool = False) -> None:
+    """Execute valve events at absolute deadlines on the monotonic clock.
+
+    With `verbose`, each valve opening is logged from a background thread.
+    With `realtime`, the playback thread is switched to realtime scheduling
+    (see `playback_timing.enable_realtime`) after the log thread is started,
+    so the log thread keeps normal priority.
+    """
+    event_log = _EventLog() if verbose else None
+    log_open = event_log.queue.append if event_log is not None else None
+    if realtime:
+        enable_realtime()
+    try:
+        _run_events(events, organ, log_open)
+    finally:
+        if event_log is not None:
+            event_log.close()
+
+
+def _run_events(
+    events: List[Event], organ: PipeOrgan, log_open: Optional[Callable[[Tuple[float, int, Tone, str]], None]]
+) -> None:
+    # Bit (valve_index + BASE_MIDI_FOR_VALVE_ZERO), i.e. the MIDI note, is set while a valve is open.
+    open_mask = 0
+    organ_update = organ.valve_update
+    wait_until = sleep_until
+    start = monotonic()
+
+    # Events sharing a timestamp (chords, or a close followed by a re-open) are
+    # handed to the organ as one batch.
+    for event_time, batch in groupby(events, key=itemgetter(0)):
+        wait_until(start + event_time)
+        changes = []
+        opened = []
+
+        for _, is_open, valve_index, tone, track_name in batch:
+            bit = 1 << (valve_index + BASE_MIDI_FOR_VALVE_ZERO)
+            if is_open:
+                if not open_mask & bit:
+                    changes.append((valve_index, True))
+                    opened.append((valve_index, tone, track_name))
+                    open_mask |= bit
+            else:
+                if open_mask & bit:
+                    changes.append((valve_index, False))
+                    open_mask &= ~bit
+
+        if changes:
+            organ_update(changes)
+        if log_open is not None:
+            for valve_index, tone, track_name in opened:
+                # The deadline sleep returns at event_time; no need to read the clock again.
+                log_open((event_time, valve_index, tone, track_name))
 
     # Make sure everything is closed when done.
-    for valve_index in list(open_valves):
-        organ.valve_close(valve_index)
+    changes = []
+    while open_mask:
+        bit = open_mask & -open_mask
+        changes.append((bit.bit_length() - 1 - BASE_MIDI_FOR_VALVE_ZERO, False))
+        open_mask ^= bit
+    if changes:
+        organ_update(changes)
 
 
 
@@ -116,6 +310,8 @@ def main() -> None:
     parser.add_argument("--audio", action="store_true", help="Enable audio output (requires sounddevice + numpy)")
     parser.add_argument("--start-time", type=float, default=0.0, help="Start time in seconds (post speed scaling)")
     parser.add_argument("--stop-time", type=float, default=None, help="Stop time in seconds (post speed scaling, exclusive)")
+    parser.add_argument("--quiet", action="store_true", help="Do not log valve events during playback")
+    parser.add_argument("--realtime", action="store_true", help="Use SCHED_FIFO, locked memory and a pinned CPU for playback (Linux, needs privileges)")
     args = parser.parse_args()
 
     midi = Midi(args.midi)
@@ -137,18 +333,16 @@ def main() -> None:
                 print(f"- {name}")
             return
 
-    events: List[Event] = []
-    for track in tracks:
-        events.extend(
-            build_valve_events(
-                track=track,
-                turn_on_delay=args.turn_on_delay,
-                turn_off_delay=args.turn_off_delay,
-                speed=args.speed,
-                start_time_limit=args.start_time,
-                stop_time_limit=args.stop_time,
-            )
-        )
+    timing = dict(
+        turn_on_delay=args.turn_on_delay,
+        turn_off_delay=args.turn_off_delay,
+        speed=args.speed,
+        start_time_limit=args.start_time,
+        stop_time_limit=args.stop_time,
+    )
+    # Each track's events are already ordered; merge them so overlapping tracks stay in chronological order.
+    per_track_events = [build_valve_events(track=track, **timing) for track in tracks]
+    events: List[Event] = list(heapq.merge(*per_track_events, key=_event_order))
 
     if not events:
         print("No events found for the selected track(s). Available tracks:")
@@ -156,9 +350,6 @@ def main() -> None:
             print(f"- {name}")
         return
 
-    # Sort combined events so overlapping tracks stay in chronological order.
-    events.sort(key=lambda e: (e[0], not e[1], e[2]))
-
     track_names = ", ".join(track.name for track in tracks)
     total_tones = sum(len(track) for track in tracks)
 
@@ -172,7 +363,7 @@ def main() -> None:
     )
 
     organ = PipeOrgan(use_audio=args.audio)
-    play_events(events, organ)
+    play_events(events, organ, verbose=not args.quiet, realtime=args.realtime)
 
 
 if __name__ == "__main__":
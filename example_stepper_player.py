@@ -2,15 +2,15 @@
 
 - Only one frequency can play at a time; if multiple notes start together,
   the first in the group is used and the rest are ignored.
-- Timing uses monotonic scheduling for accuracy.
+- Timing uses absolute monotonic deadlines for accuracy.
 """
 
 import argparse
-import time
 from typing import Iterable, List, Sequence, Tuple
 
 from miditones import Midi
 from miditones.tone import Tone
+from playback_timing import enable_realtime, monotonic, sleep_until
 from stepper_interface import StepperInterface
 
 Event = Tuple[float, bool, float, Tone]
@@ -41,13 +41,13 @@ def build_events(
     return events
 
 
-def play_events(events: List[Event], motor: StepperInterface) -> None:
-    start = time.monotonic()
+def play_events(events: List[Event], motor: StepperInterface, realtime: bool = False) -> None:
+    if realtime:
+        enable_realtime()
+    wait_until = sleep_until
+    start = monotonic()
     for event_time, is_start, freq, tone in events:
-        elapsed = time.monotonic() - start
-        wait = event_time - elapsed
-        if wait > 0:
-            time.sleep(wait)
+        wait_until(start + event_time)
 
         if is_start:
             motor.set_frequency(freq)
@@ -63,6 +63,7 @@ def main() -> None:
     parser.add_argument("--midi", default="imperialmarch.mid", help="Path to the MIDI file")
     parser.add_argument("--track", default="Trumpet", help="Track name to use")
     parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier")
+    parser.add_argument("--realtime", action="store_true", help="Use SCHED_FIFO, locked memory and a pinned CPU for playback (Linux, needs privileges)")
     args = parser.parse_args()
 
     if args.speed <= 0:
@@ -80,7 +81,7 @@ def main() -> None:
     print(f"Events: {len(events)} | speed={args.speed:.3f}x")
 
     motor = StepperInterface()
-    play_events(events, motor)
+    play_events(events, motor, realtime=args.realtime)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled counterpart of parser.scan_track() (optional).
+
+Build in place with ``cythonize -i miditones/_parser_c.pyx``. When this module
+is not compiled, parser.scan_track() uses its pure-Python loop instead; both
+return identical results.
+"""
+
+from libc.string cimport memset
+
+cdef enum:
+    NOTE_SLOTS = 128 * 16
+
+
+def scan_track_c(midi_track):
+    """Single pass over a track's messages; see parser.scan_track() for the result layout."""
+    # Active notes live in C arrays indexed by (note << 4) | channel instead of a dict.
+    # A velocity of 0 marks a free slot (note_on with velocity 0 is a note_off).
+    cdef long long active_tick[NOTE_SLOTS]
+    cdef int active_velocity[NOTE_SLOTS]
+    cdef long long active_order[NOTE_SLOTS]
+    cdef long long next_order = 0
+    cdef long long current_tick = 0
+    cdef int slot, note, velocity, channel = 0
+    cdef Py_ssize_t closed_count
+
+    memset(active_velocity, 0, sizeof(active_velocity))
+
+    track_name = None
+    program = None
+    channel_counts = [0] * 16
+    channel_order = []
+    tempo_changes = []
+    start_ticks = []
+    end_ticks = []
+    midi_notes = []
+    velocities = []
+
+    for msg in midi_track:
+        current_tick += msg.time
+        msg_type = msg.type
+
+        msg_channel = getattr(msg, 'channel', None)
+        if msg_channel is not None:
+            channel = msg_channel
+            if not channel_counts[channel]:
+                channel_order.append(channel)
+            channel_counts[channel] += 1
+
+        if msg_type == 'note_on' or msg_type == 'note_off':
+            note = msg.note
+            velocity = msg.velocity
+            slot = (note << 4) | channel
+
+            if msg_type == 'note_on' and velocity > 0:
+                # Note starts; a re-struck note keeps its original position,
+                # like a dict key that is overwritten
+                if active_velocity[slot] == 0:
+                    active_order[slot] = next_order
+                    next_order += 1
+                active_tick[slot] = current_tick
+                active_velocity[slot] = velocity
+
+            elif active_velocity[slot] != 0:
+                # Note ends
+                start_ticks.append(active_tick[slot])
+                end_ticks.append(current_tick)
+                midi_notes.append(note)
+                velocities.append(active_velocity[slot])
+                active_velocity[slot] = 0
+
+        elif msg_type == 'set_tempo':
+            tempo_changes.append((current_tick, msg.tempo))
+
+        elif msg_type == 'track_name':
+            if track_name is None and msg.name.strip():
+                track_name = msg.name.strip()
+
+        elif msg_type == 'program_change':
+            program = msg.program
+
+    # Handle notes without note_off (extend to end of track), in the order they started
+    closed_count = len(start_ticks)
+    open_notes = sorted([(active_order[slot], slot) for slot in range(NOTE_SLOTS)
+                         if active_velocity[slot] != 0])
+    for _, slot in open_notes:
+        start_ticks.append(active_tick[slot])
+        end_ticks.append(current_tick)
+        midi_notes.append(slot >> 4)
+        velocities.append(active_velocity[slot])
+
+    note_events = (start_ticks, end_ticks, midi_notes, velocities, closed_count)
+    return track_name, program, channel_counts, note_events, tempo_changes, channel_order
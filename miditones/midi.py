@@ -1,7 +1,7 @@
 """Midi class for loading and accessing MIDI file content."""
 
 from typing import Dict, List
-from .parser import parse_midi_file, build_tempo_map, extract_track_names
+from .parser import parse_midi_file, scan_track, merge_tempo_changes, resolve_track_names
 from .track import Track
 
 
@@ -21,47 +21,41 @@ class Midi:
         """
         self._filename = filename
         self._midi_file = parse_midi_file(filename)
-        self._tempo_map = build_tempo_map(self._midi_file)
-        self._track_names = extract_track_names(self._midi_file)
+        
+        # Read every track once; names, channels, tempo map and notes all come from this pass
+        scans = [scan_track(midi_track) for midi_track in self._midi_file.tracks]
+        self._tempo_map = merge_tempo_changes(scan[4] for scan in scans)
+        self._track_names = resolve_track_names([(scan[0], scan[1]) for scan in scans])
         
         # Create Track objects
         self._tracks = {}
-        for idx, (track_name, midi_track) in enumerate(zip(self._track_names, 
-                                                            self._midi_file.tracks)):
+        for track_name, midi_track, scan in zip(self._track_names, self._midi_file.tracks, scans):
             # Determine primary channel for this track
-            channel = self._get_primary_channel(midi_track)
+            channel = self._get_primary_channel(scan[2], scan[5])
             
             track_obj = Track(
                 name=track_name,
                 channel=channel,
                 midi_track=midi_track,
                 tempo_map=self._tempo_map,
-                ticks_per_beat=self._midi_file.ticks_per_beat
+                ticks_per_beat=self._midi_file.ticks_per_beat,
+                note_events=scan[3]
             )
             self._tracks[track_name] = track_obj
     
-    def _get_primary_channel(self, midi_track) -> int:
+    def _get_primary_channel(self, channel_counts: List[int], channel_order: List[int]) -> int:
         """
         Get the primary MIDI channel used by a track.
         
         Args:
-            midi_track: Raw MIDI track
+            channel_counts: Message count per channel (16 entries) from scan_track()
+            channel_order: Channels in order of first use, from scan_track()
         
         Returns:
             Primary channel (0-15), defaults to 0
         """
-        channel_counts = {}
-        
-        for msg in midi_track:
-            if hasattr(msg, 'channel'):
-                channel = msg.channel
-                channel_counts[channel] = channel_counts.get(channel, 0) + 1
-        
-        if channel_counts:
-            # Return the most frequently used channel
-            return max(channel_counts.items(), key=lambda x: x[1])[0]
-        else:
-            return 0
+        # Return the most frequently used channel (first used on ties); 0 if none are used
+        return max(channel_order, key=channel_counts.__getitem__, default=0)
     
     def __getitem__(self, track_name: str) -> Track:
         """
@@ -1,10 +1,38 @@
 """MIDI parsing logic for tempo maps, track names, and event processing."""
 
+import math
 import os
-from typing import List, Dict, Iterator, Tuple
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import groupby
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 import mido
 from .tone import Tone
-from .utils import ticks_to_seconds
+from .utils import np, ticks_array_to_seconds, ticks_to_seconds
+
+try:
+    from ._parser_c import scan_track_c as _scan_track_c
+except ImportError:  # optional compiled extension, see _parser_c.pyx
+    _scan_track_c = None
+
+# (tempo_ticks, tempos, boundary_times) - see build_tempo_index()
+TempoIndex = Tuple[List[int], List[int], List[float]]
+
+# Paired notes as parallel lists (start_ticks, end_ticks, midi_notes, velocities)
+# plus closed_count: entries from closed_count on never got a note_off and end at
+# the last tick of the track
+NoteEvents = Tuple[List[int], List[int], List[int], List[int], int]
+
+# (track_name, program, channel_counts, note_events, tempo_changes, channel_order) - see scan_track()
+TrackScan = Tuple[Optional[str], Optional[int], List[int], NoteEvents, List[Tuple[int, int]], List[int]]
+
+# Instrument name per General MIDI program number (0-127), None where unnamed
+_INSTRUMENT_TABLE = (
+    "Acoustic Grand Piano", "Bright Acoustic Piano",
+    "Electric Grand Piano", "Honky-tonk Piano",
+    "Electric Piano 1", "Electric Piano 2",
+    # Add more as needed - truncated for brevity
+) + (None,) * 122
 
 
 def parse_midi_file(filename: str) -> mido.MidiFile:
@@ -41,37 +69,40 @@ def build_tempo_map(midi_file: mido.MidiFile) -> List[Tuple[int, int]]:
     Returns:
         List of (absolute_tick, tempo_us) tuples sorted by tick
     """
-    tempo_map = []
-    current_tick = 0
-    
-    # Default tempo is 120 BPM = 500000 microseconds per beat
-    default_tempo = 500000
-    tempo_map.append((0, default_tempo))
-    
     # Scan all tracks for tempo changes
+    tempo_changes = []
     for track in midi_file.tracks:
         current_tick = 0
+        track_changes = []
         for msg in track:
             current_tick += msg.time
             if msg.type == 'set_tempo':
-                # Add tempo change with absolute tick position
-                tempo_map.append((current_tick, msg.tempo))
+                track_changes.append((current_tick, msg.tempo))
+        tempo_changes.append(track_changes)
     
-    # Sort by tick and remove duplicates (keep last tempo at same tick)
-    tempo_map.sort(key=lambda x: x[0])
+    return merge_tempo_changes(tempo_changes)
+
+
+def merge_tempo_changes(tempo_changes: Iterable[List[Tuple[int, int]]]) -> List[Tuple[int, int]]:
+    """
+    Combine per-track tempo changes into a single tempo map.
+    
+    Args:
+        tempo_changes: One list of (absolute_tick, tempo_us) tuples per track, in track order
     
-    # Remove duplicate ticks, keeping the last tempo value
-    unique_tempo_map = []
-    last_tick = -1
-    for tick, tempo in tempo_map:
-        if tick != last_tick:
-            unique_tempo_map.append((tick, tempo))
-            last_tick = tick
-        else:
-            # Replace previous entry with same tick
-            unique_tempo_map[-1] = (tick, tempo)
+    Returns:
+        List of (absolute_tick, tempo_us) tuples sorted by tick
+    """
+    # Default tempo is 120 BPM = 500000 microseconds per beat
+    default_tempo = 500000
     
-    return unique_tempo_map
+    # Keyed by absolute tick, so a later tempo at the same tick replaces the earlier one
+    tempo_by_tick = {0: default_tempo}
+    for track_changes in tempo_changes:
+        for tick, tempo in track_changes:
+            tempo_by_tick[tick] = tempo
+    
+    return sorted(tempo_by_tick.items())
 
 
 def extract_track_names(midi_file: mido.MidiFile) -> List[str]:
@@ -90,17 +121,9 @@ def extract_track_names(midi_file: mido.MidiFile) -> List[str]:
     Returns:
         List of track names (one per track)
     """
-    track_names = []
-    name_counts = {}
-    
-    instrument_names = {
-        0: "Acoustic Grand Piano", 1: "Bright Acoustic Piano", 
-        2: "Electric Grand Piano", 3: "Honky-tonk Piano",
-        4: "Electric Piano 1", 5: "Electric Piano 2",
-        # Add more as needed - truncated for brevity
-    }
+    track_info = []
     
-    for idx, track in enumerate(midi_file.tracks):
+    for track in midi_file.tracks:
         name = None
         program = None
         
@@ -112,82 +135,248 @@ def extract_track_names(midi_file: mido.MidiFile) -> List[str]:
             elif msg.type == 'program_change':
                 program = msg.program
         
+        track_info.append((name, program))
+    
+    return resolve_track_names(track_info)
+
+
+def resolve_track_names(track_info: List[Tuple[Optional[str], Optional[int]]]) -> List[str]:
+    """
+    Apply the naming strategy of extract_track_names() to already scanned tracks.
+    
+    Args:
+        track_info: One (track_name or None, program or None) tuple per track
+    
+    Returns:
+        List of track names (one per track)
+    """
+    track_names = []
+    name_counts = defaultdict(int)
+    
+    for idx, (name, program) in enumerate(track_info):
         # Apply naming strategy
         if not name:
-            if program is not None and program in instrument_names:
-                name = instrument_names[program]
-            else:
+            name = _INSTRUMENT_TABLE[program] if program is not None else None
+            if name is None:
                 name = f"Track {idx}"
         
         # Handle duplicates
-        if name in name_counts:
-            name_counts[name] += 1
+        name_counts[name] += 1
+        if name_counts[name] > 1:
             name = f"{name} ({name_counts[name]})"
-        else:
-            name_counts[name] = 1
         
         track_names.append(name)
     
     return track_names
 
 
-def get_tempo_at_tick(tick: int, tempo_map: List[Tuple[int, int]]) -> int:
+def scan_track(midi_track) -> TrackScan:
     """
-    Get the tempo (in microseconds per beat) at a specific tick.
+    Collect everything the library needs from a track in a single pass over its messages.
     
     Args:
-        tick: Absolute tick position
-        tempo_map: List of (tick, tempo_us) tuples
+        midi_track: Raw MIDI track from mido
     
     Returns:
-        Tempo in microseconds per beat
+        Tuple of (track_name, program, channel_counts, note_events, tempo_changes, channel_order):
+        - track_name: First non-empty track_name meta message, or None
+        - program: Last program_change program number, or None
+        - channel_counts: Number of channel messages for each channel 0-15
+        - note_events: Paired notes, see NoteEvents
+        - tempo_changes: List of (absolute_tick, tempo_us) tuples
+        - channel_order: Channels that occur, in the order they are first used
     """
-    current_tempo = tempo_map[0][1]  # Default tempo
+    if _scan_track_c is not None:
+        return _scan_track_c(midi_track)
+    
+    track_name = None
+    program = None
+    channel_counts = [0] * 16
+    channel_order = []
+    tempo_changes = []
+    
+    # Track active notes: {(note, channel): (start_tick, velocity)}
+    active_notes = {}
+    
+    # Collect all note events as parallel lists of absolute ticks
+    start_ticks = []
+    end_ticks = []
+    midi_notes = []
+    velocities = []
+    current_tick = 0
+    
+    for msg in midi_track:
+        current_tick += msg.time
+        msg_type = msg.type
+        
+        channel = getattr(msg, 'channel', None)
+        if channel is not None:
+            if not channel_counts[channel]:
+                channel_order.append(channel)
+            channel_counts[channel] += 1
+        
+        if msg_type == 'note_on' and msg.velocity > 0:
+            # Note starts
+            key = (msg.note, channel)
+            active_notes[key] = (current_tick, msg.velocity)
+        
+        elif msg_type == 'note_off' or (msg_type == 'note_on' and msg.velocity == 0):
+            # Note ends
+            key = (msg.note, channel)
+            active = active_notes.pop(key, None)
+            if active is not None:
+                start_ticks.append(active[0])
+                end_ticks.append(current_tick)
+                midi_notes.append(msg.note)
+                velocities.append(active[1])
+        
+        elif msg_type == 'set_tempo':
+            tempo_changes.append((current_tick, msg.tempo))
+        
+        elif msg_type == 'track_name':
+            if track_name is None and msg.name.strip():
+                track_name = msg.name.strip()
+        
+        elif msg_type == 'program_change':
+            program = msg.program
     
-    for map_tick, tempo in tempo_map:
-        if map_tick <= tick:
-            current_tempo = tempo
-        else:
-            break
+    # Handle notes without note_off (extend to end of track); they follow
+    # the first closed_count entries of the lists
+    closed_count = len(start_ticks)
+    for (note, channel), (start_tick, velocity) in active_notes.items():
+        start_ticks.append(start_tick)
+        end_ticks.append(current_tick)
+        midi_notes.append(note)
+        velocities.append(velocity)
     
-    return current_tempo
+    note_events = (start_ticks, end_ticks, midi_notes, velocities, closed_count)
+    return track_name, program, channel_counts, note_events, tempo_changes, channel_order
 
 
-def calculate_absolute_time(tick: int, tempo_map: List[Tuple[int, int]], 
-                           ticks_per_beat: int) -> float:
+def build_tempo_index(tempo_map: List[Tuple[int, int]], ticks_per_beat: int) -> TempoIndex:
     """
-    Calculate absolute time in seconds for a given tick, considering tempo changes.
+    Split a tempo map into parallel lists for binary search.
     
     Args:
-        tick: Absolute tick position
-        tempo_map: List of (tick, tempo_us) tuples
+        tempo_map: List of (tick, tempo_us) tuples sorted by tick
         ticks_per_beat: MIDI ticks per beat
     
     Returns:
-        Absolute time in seconds
+        Tuple of (tempo_ticks, tempos, boundary_times) where boundary_times[i]
+        is the absolute time in seconds at tempo_ticks[i]
     """
+    tempo_ticks = [tick for tick, _ in tempo_map]
+    tempos = [tempo for _, tempo in tempo_map]
+    boundary_times = []
+    
     time_seconds = 0.0
     last_tempo_tick = 0
-    current_tempo = tempo_map[0][1]
+    current_tempo = tempos[0]
     
     for tempo_tick, tempo in tempo_map:
-        if tempo_tick > tick:
-            break
-        
         # Add time from last tempo change to this one
         if tempo_tick > last_tempo_tick:
             elapsed_ticks = tempo_tick - last_tempo_tick
             time_seconds += ticks_to_seconds(elapsed_ticks, current_tempo, ticks_per_beat)
         
+        boundary_times.append(time_seconds)
         last_tempo_tick = tempo_tick
         current_tempo = tempo
     
+    return tempo_ticks, tempos, boundary_times
+
+
+def time_at_tick(tick: int, tempo_index: TempoIndex, ticks_per_beat: int) -> float:
+    """
+    Calculate absolute time in seconds for a tick using a prebuilt tempo index.
+    
+    Args:
+        tick: Absolute tick position
+        tempo_index: Result of build_tempo_index()
+        ticks_per_beat: MIDI ticks per beat
+    
+    Returns:
+        Absolute time in seconds
+    """
+    idx = bisect_right(tempo_index[0], tick) - 1
+    return _time_in_segment(tick, idx, tempo_index, ticks_per_beat)
+
+
+def times_at_ticks(ticks: Iterable[int], tempo_index: TempoIndex,
+                   ticks_per_beat: int) -> Dict[int, float]:
+    """
+    Calculate absolute times for many ticks in a single walk over the tempo map.
+    
+    Args:
+        ticks: Absolute tick positions (any order, duplicates allowed)
+        tempo_index: Result of build_tempo_index()
+        ticks_per_beat: MIDI ticks per beat
+    
+    Returns:
+        Dictionary mapping each distinct tick to its absolute time in seconds
+    """
+    tempo_ticks = tempo_index[0]
+    last_idx = len(tempo_ticks) - 1
+    idx = -1
+    times = {}
+    
+    for tick in sorted(set(ticks)):
+        # Queries are ascending, so the active tempo segment only moves forward
+        while idx < last_idx and tempo_ticks[idx + 1] <= tick:
+            idx += 1
+        times[tick] = _time_in_segment(tick, idx, tempo_index, ticks_per_beat)
+    
+    return times
+
+
+def _time_in_segment(tick: int, idx: int, tempo_index: TempoIndex, ticks_per_beat: int) -> float:
+    """Absolute time of a tick that falls in tempo segment idx (-1 = before the first entry)."""
+    tempo_ticks, tempos, boundary_times = tempo_index
+    
+    if idx < 0:
+        # Before the first tempo entry, which then applies from tick 0
+        return ticks_to_seconds(tick, tempos[0], ticks_per_beat) if tick > 0 else 0.0
+    
     # Add remaining time from last tempo change to target tick
-    if tick > last_tempo_tick:
-        elapsed_ticks = tick - last_tempo_tick
-        time_seconds += ticks_to_seconds(elapsed_ticks, current_tempo, ticks_per_beat)
+    if tick > tempo_ticks[idx]:
+        elapsed_ticks = tick - tempo_ticks[idx]
+        return boundary_times[idx] + ticks_to_seconds(elapsed_ticks, tempos[idx], ticks_per_beat)
+    return boundary_times[idx]
+
+
+def get_tempo_at_tick(tick: int, tempo_map: List[Tuple[int, int]]) -> int:
+    """
+    Get the tempo (in microseconds per beat) at a specific tick.
+    
+    Args:
+        tick: Absolute tick position
+        tempo_map: List of (tick, tempo_us) tuples
+    
+    Returns:
+        Tempo in microseconds per beat
+    """
+    # (tick, inf) sorts after every entry at or before tick, whatever its tempo
+    idx = bisect_right(tempo_map, (tick, math.inf)) - 1
+    return tempo_map[max(idx, 0)][1]
+
+
+def calculate_absolute_time(tick: int, tempo_map: List[Tuple[int, int]], 
+                           ticks_per_beat: int) -> float:
+    """
+    Calculate absolute time in seconds for a given tick, considering tempo changes.
+    
+    For repeated queries against the same tempo map, build the index once with
+    build_tempo_index() and use time_at_tick().
+    
+    Args:
+        tick: Absolute tick position
+        tempo_map: List of (tick, tempo_us) tuples
+        ticks_per_beat: MIDI ticks per beat
     
-    return time_seconds
+    Returns:
+        Absolute time in seconds
+    """
+    return time_at_tick(tick, build_tempo_index(tempo_map, ticks_per_beat), ticks_per_beat)
 
 
 def process_track_events(midi_track, tempo_map: List[Tuple[int, int]], 
@@ -201,106 +390,83 @@ def process_track_events(midi_track, tempo_map: List[Tuple[int, int]],
         ticks_per_beat: MIDI ticks per beat
     
     Yields:
-        Lists of Tone objects (grouped by start time)
+        Lists of Tone objects (grouped by start tick)
     """
-    # Track active notes: {(note, channel): (start_tick, velocity)}
-    active_notes = {}
+    return build_tone_groups(scan_track(midi_track)[3], tempo_map, ticks_per_beat)
+
+
+def _note_times(note_events: NoteEvents, tempo_map: List[Tuple[int, int]],
+                ticks_per_beat: int) -> Tuple[List[float], List[float]]:
+    """Start times and durations in seconds, parallel to the note events."""
+    start_ticks, end_ticks, _, _, closed_count = note_events
+    tempo_index = build_tempo_index(tempo_map, ticks_per_beat)
+    if np is not None:
+        tick_times = ticks_array_to_seconds(start_ticks + end_ticks, tempo_index[0], tempo_index[1],
+                                            ticks_per_beat).tolist()
+        start_times = tick_times[:len(start_ticks)]
+        end_times = tick_times[len(start_ticks):]
+    else:
+        tick_times = times_at_ticks(start_ticks + end_ticks, tempo_index, ticks_per_beat)
+        start_times = [tick_times[tick] for tick in start_ticks]
+        end_times = [tick_times[tick] for tick in end_ticks]
+    durations = [end - start for end, start in zip(end_times, start_times)]
+    for i in range(closed_count, len(start_ticks)):
+        durations[i] = max(durations[i], 0.1)  # Minimum duration
+    return start_times, durations
+
+
+def count_and_duration(note_events: NoteEvents, tempo_map: List[Tuple[int, int]],
+                       ticks_per_beat: int) -> Tuple[int, float]:
+    """
+    Count the notes of a track and find when the last one ends, without building Tones.
     
-    # Collect all note events with absolute timing
-    note_events = []
-    current_tick = 0
+    Args:
+        note_events: Paired notes from scan_track()
+        tempo_map: List of (tick, tempo_us) tuples
+        ticks_per_beat: MIDI ticks per beat
     
-    for msg in midi_track:
-        current_tick += msg.time
-        
-        if msg.type == 'note_on' and msg.velocity > 0:
-            # Note starts
-            key = (msg.note, msg.channel)
-            active_notes[key] = (current_tick, msg.velocity)
-        
-        elif msg.type == 'note_off' or (msg.type == 'note_on' and msg.velocity == 0):
-            # Note ends
-            key = (msg.note, msg.channel)
-            if key in active_notes:
-                start_tick, velocity = active_notes[key]
-                duration_ticks = current_tick - start_tick
-                
-                # Calculate times
-                start_time = calculate_absolute_time(start_tick, tempo_map, ticks_per_beat)
-                end_time = calculate_absolute_time(current_tick, tempo_map, ticks_per_beat)
-                duration = end_time - start_time
-                
-                note_events.append({
-                    'midi_note': msg.note,
-                    'start_time': start_time,
-                    'duration': duration,
-                    'velocity': velocity,
-                    'start_tick': start_tick,
-                    'duration_ticks': duration_ticks
-                })
-                
-                del active_notes[key]
-    
-    # Handle notes without note_off (extend to end of track)
-    for (note, channel), (start_tick, velocity) in active_notes.items():
-        start_time = calculate_absolute_time(start_tick, tempo_map, ticks_per_beat)
-        end_time = calculate_absolute_time(current_tick, tempo_map, ticks_per_beat)
-        duration = end_time - start_time
-        duration_ticks = current_tick - start_tick
-        
-        note_events.append({
-            'midi_note': note,
-            'start_time': start_time,
-            'duration': max(duration, 0.1),  # Minimum duration
-            'velocity': velocity,
-            'start_tick': start_tick,
-            'duration_ticks': max(duration_ticks, 1)
-        })
-    
-    # Sort by start time, then by pitch
-    note_events.sort(key=lambda x: (x['start_time'], x['midi_note']))
-    
-    # Group simultaneous notes (within 0.001 second tolerance)
-    if not note_events:
+    Returns:
+        Tuple of (note_count, duration) where duration is the latest
+        start_time + duration of any note in seconds (0.0 without notes)
+    """
+    if not note_events[0]:
+        return 0, 0.0
+    start_times, durations = _note_times(note_events, tempo_map, ticks_per_beat)
+    return len(start_times), max(0.0, max(map(float.__add__, start_times, durations)))
+
+
+def build_tone_groups(note_events: NoteEvents, tempo_map: List[Tuple[int, int]],
+                      ticks_per_beat: int) -> Iterator[List[Tone]]:
+    """
+    Convert note events from scan_track() to Tone objects, yielding groups of simultaneous notes.
+    
+    Args:
+        note_events: Paired notes from scan_track()
+        tempo_map: List of (tick, tempo_us) tuples
+        ticks_per_beat: MIDI ticks per beat
+    
+    Yields:
+        Lists of Tone objects (grouped by start tick)
+    """
+    start_ticks, end_ticks, midi_notes, velocities, closed_count = note_events
+    if not start_ticks:
         return
     
-    current_group = []
-    current_start_time = None
-    tolerance = 0.001  # 1ms tolerance for grouping
-    
-    for event in note_events:
-        if current_start_time is None or abs(event['start_time'] - current_start_time) < tolerance:
-            # Add to current group
-            if current_start_time is None:
-                current_start_time = event['start_time']
-            
-            tone = Tone(
-                midi_note=event['midi_note'],
-                duration=event['duration'],
-                velocity=event['velocity'],
-                    start_time=event['start_time'],
-                    duration_ticks=event['duration_ticks'],
-                    start_tick=event['start_tick']
-            )
-            current_group.append(tone)
-        else:
-            # Yield current group and start new one
-            if current_group:
-                # Sort group by pitch (lowest to highest)
-                current_group.sort(key=lambda t: t.midi_note)
-                yield current_group
-            
-            current_group = [Tone(
-                midi_note=event['midi_note'],
-                duration=event['duration'],
-                velocity=event['velocity'],
-                start_time=event['start_time'],
-                duration_ticks=event['duration_ticks'],
-                start_tick=event['start_tick']
-            )]
-            current_start_time = event['start_time']
-    
-    # Yield final group
-    if current_group:
-        current_group.sort(key=lambda t: t.midi_note)
-        yield current_group
+    start_times, durations = _note_times(note_events, tempo_map, ticks_per_beat)
+    duration_ticks = [end - start for end, start in zip(end_ticks, start_ticks)]
+    for i in range(closed_count, len(start_ticks)):
+        duration_ticks[i] = max(duration_ticks[i], 1)
+    
+    # Sort by start tick, then by pitch
+    order = sorted(range(len(start_ticks)), key=lambda i: (start_ticks[i], midi_notes[i]))
+    
+    # Group simultaneous notes: those sharing a start tick (already ordered by pitch).
+    # Each Tone is built exactly once, positionally:
+    # (midi_note, duration, velocity, start_time, duration_ticks, start_tick)
+    make_tone = Tone
+    for _, group in groupby(order, key=start_ticks.__getitem__):
+        yield [
+            make_tone(midi_notes[i], durations[i], velocities[i],
+                      start_times[i], duration_ticks[i], start_ticks[i])
+            for i in group
+        ]
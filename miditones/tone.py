@@ -1,11 +1,26 @@
 """Tone class representing a single musical note."""
 
-from .utils import midi_to_frequency, midi_to_note_name, midi_to_note_int
+from .utils import _TABLE, midi_info
+
+
+class _NoteTable(dict):
+    """NoteInfo (frequency, names, note_int and str/repr prefixes) keyed by MIDI note."""
+    
+    def __missing__(self, midi_note: int):
+        info = self[midi_note] = midi_info(midi_note)
+        return info
+
+
+# Shared by all tones: the MIDI range comes from utils' table, other notes are added on first use
+_NOTE_INFO = _NoteTable(enumerate(_TABLE))
 
 
 class Tone:
     """Represents a single musical note/tone."""
     
+    __slots__ = ('_midi_note', '_duration', '_velocity', '_start_time', '_duration_ticks',
+                 '_start_tick')
+    
     def __init__(self, midi_note: int, duration: float, velocity: int, start_time: float,
                  duration_ticks: int, start_tick: int):
         """
@@ -25,16 +40,11 @@ class Tone:
         self._start_time = start_time
         self._duration_ticks = duration_ticks
         self._start_tick = start_tick
-        
-        # Pre-calculate derived properties
-        self._frequency = midi_to_frequency(midi_note)
-        self._note_name, self._note_full = midi_to_note_name(midi_note)
-        self._note_int = midi_to_note_int(midi_note)
     
     @property
     def frequency(self) -> float:
         """Frequency in Hertz (Hz). Calculated using A4 = 440 Hz."""
-        return self._frequency
+        return _NOTE_INFO[self._midi_note].freq
     
     @property
     def midi_note(self) -> int:
@@ -44,17 +54,17 @@ class Tone:
     @property
     def note_int(self) -> int:
         """Integer representation of the semitone relative to A (A=0, A#=1, ..., G#=11)."""
-        return self._note_int
+        return _NOTE_INFO[self._midi_note].note_int
     
     @property
     def note_name(self) -> str:
         """String representation of the note (e.g., "A#", "C", "F#")."""
-        return self._note_name
+        return _NOTE_INFO[self._midi_note].name
     
     @property
     def note_full(self) -> str:
         """Full note name with octave (e.g., "A4", "C#5", "F3")."""
-        return self._note_full
+        return _NOTE_INFO[self._midi_note].full
     
     @property
     def duration(self) -> float:
@@ -83,11 +93,11 @@ class Tone:
     
     def __str__(self) -> str:
         """Returns human-readable representation: 'A4 (440.00 Hz) - 0.5s'"""
-        return f"{self.note_full} ({self.frequency:.2f} Hz) - {self.duration:.1f}s"
+        return f"{_NOTE_INFO[self._midi_note].str_prefix}{self._duration:.1f}s"
     
     def __repr__(self) -> str:
         """Returns detailed representation: 'Tone(note='A4', frequency=440.0, duration=0.5)'"""
         return (
-            f"Tone(note='{self.note_full}', frequency={self.frequency}, duration={self.duration}, "
-            f"duration_ticks={self.duration_ticks})"
+            f"{_NOTE_INFO[self._midi_note].repr_prefix}duration={self._duration}, "
+            f"duration_ticks={self._duration_ticks})"
         )
@@ -1,6 +1,7 @@
 """Track class representing a single MIDI track."""
 
-from typing import Iterator, List
+from bisect import bisect_left
+from typing import Iterator, List, Optional, Tuple
 from .tone import Tone
 
 
@@ -8,7 +9,7 @@ class Track:
     """Represents a single MIDI track. Iterable - yields lists of Tone objects."""
     
     def __init__(self, name: str, channel: int, midi_track, tempo_map: List[tuple], 
-                 ticks_per_beat: int):
+                 ticks_per_beat: int, note_events: Optional[tuple] = None):
         """
         Initialize a Track object.
         
@@ -18,14 +19,19 @@ class Track:
             midi_track: Raw MIDI track from mido
             tempo_map: List of (tick, tempo_us) tuples
             ticks_per_beat: MIDI ticks per beat
+            note_events: Paired notes from parser.scan_track(), if the track was
+                already scanned; otherwise midi_track is scanned on first use
         """
         self._name = name
         self._channel = channel
         self._midi_track = midi_track
         self._tempo_map = tempo_map
         self._ticks_per_beat = ticks_per_beat
+        self._note_events = note_events
         self._duration = None
         self._note_count = None
+        self._groups = None
+        self._group_start_times = None
     
     @property
     def name(self) -> str:
@@ -52,18 +58,74 @@ class Track:
         the list contains all those tones. Single notes are also yielded as a list
         with one item.
         """
-        from .parser import process_track_events
+        # Groups are cached as tuples; each caller gets its own list to modify freely
+        for tone_group in self._tone_groups():
+            yield list(tone_group)
+    
+    def slice(self, start_time: float = 0.0, stop_time: Optional[float] = None) -> List[List[Tone]]:
+        """
+        Get the tone groups whose start time falls in [start_time, stop_time).
         
-        # Process track events and yield tone groups
-        for tone_group in process_track_events(self._midi_track, self._tempo_map, 
-                                                 self._ticks_per_beat):
-            yield tone_group
+        Args:
+            start_time: Earliest group start time in seconds (inclusive)
+            stop_time: Latest group start time in seconds (exclusive), None for the end
+        
+        Returns:
+            List of tone groups, in track order
+        """
+        groups = self._tone_groups()
+        lo = bisect_left(self._group_start_times, start_time)
+        hi = len(groups) if stop_time is None else bisect_left(self._group_start_times, stop_time)
+        return [list(tone_group) for tone_group in groups[lo:hi]]
     
-    def __len__(self) -> int:
-        """Returns the total number of tones in the track."""
+    def _paired_notes(self) -> tuple:
+        """Note events from parser.scan_track(), scanning the track on first use."""
+        if self._note_events is None:
+            from .parser import scan_track
+            
+            self._note_events = scan_track(self._midi_track)[3]
+        return self._note_events
+    
+    def _tone_groups(self) -> List[Tuple[Tone, ...]]:
+        """
+        Parse the track on first use and cache the resulting tone groups.
+        
+        Note count and duration are accumulated in the same pass, so the first
+        iteration also answers len() and duration.
+        """
+        if self._groups is None:
+            from .parser import build_tone_groups
+            
+            groups = []
+            group_start_times = []
+            note_count = 0
+            max_end_time = 0.0
+            for tone_group in build_tone_groups(self._paired_notes(), self._tempo_map,
+                                                self._ticks_per_beat):
+                groups.append(tuple(tone_group))
+                group_start_times.append(tone_group[0].start_time)
+                note_count += len(tone_group)
+                for tone in tone_group:
+                    end_time = tone.start_time + tone.duration
+                    if end_time > max_end_time:
+                        max_end_time = end_time
+            
+            self._groups = groups
+            self._group_start_times = group_start_times
+            self._note_count = note_count
+            self._duration = max_end_time
+        return self._groups
+    
+    @property
+    def note_count(self) -> int:
+        """Total number of tones in the track, counted without building Tone objects."""
         if self._note_count is None:
-            self._calculate_track_info()
+            self._note_count = len(self._paired_notes()[0])
         return self._note_count
+    
+    def __len__(self) -> int:
+        """Returns the total number of tones in the track."""
+        return self.note_count
 
     @property
     def ticks_per_beat(self) -> int:
@@ -71,16 +133,8 @@ class Track:
         return self._ticks_per_beat
     
     def _calculate_track_info(self):
-        """Calculate duration and note count by iterating through the track."""
-        max_end_time = 0.0
-        note_count = 0
-        
-        for tone_group in self:
-            for tone in tone_group:
-                note_count += 1
-                end_time = tone.start_time + tone.duration
-                if end_time > max_end_time:
-                    max_end_time = end_time
+        """Calculate duration and note count from the paired notes, without building Tones."""
+        from .parser import count_and_duration
         
-        self._duration = max_end_time
-        self._note_count = note_count
+        self._note_count, self._duration = count_and_duration(self._paired_notes(), self._tempo_map,
+                                                              self._ticks_per_beat)
@@ -1,7 +1,63 @@
 """Helper functions for MIDI note conversions and time calculations."""
 
 import math
-from typing import Tuple
+from typing import NamedTuple, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # optional dependency, see ticks_array_to_seconds()
+    np = None  # type: ignore
+
+_NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+
+class NoteInfo(NamedTuple):
+    """Properties derived from a MIDI note number."""
+    freq: float
+    name: str
+    full: str
+    note_int: int
+    str_prefix: str   # start of str(Tone), e.g. "A4 (440.00 Hz) - "
+    repr_prefix: str  # start of repr(Tone), e.g. "Tone(note='A4', frequency=440.0, "
+
+
+def _frequency(midi_note: float) -> float:
+    return 440.0 * math.pow(2, (midi_note - 69) / 12.0)
+
+
+def _note_info(midi_note: int) -> NoteInfo:
+    name = _NOTE_NAMES[midi_note % 12]
+    freq = _frequency(midi_note)
+    full = f"{name}{(midi_note // 12) - 1}"
+    return NoteInfo(
+        freq=freq,
+        name=name,
+        full=full,
+        note_int=(midi_note - 21) % 12,
+        str_prefix=f"{full} ({freq:.2f} Hz) - ",
+        repr_prefix=f"Tone(note='{full}', frequency={freq}, ",
+    )
+
+
+# Lookup table for the MIDI range (0-127), built once at import
+_TABLE = tuple(_note_info(n) for n in range(128))
+
+
+def midi_info(midi_note: int) -> NoteInfo:
+    """
+    Get all derived properties of a MIDI note at once.
+    
+    Args:
+        midi_note: MIDI note number (0-127; other values are computed directly)
+    
+    Returns:
+        NoteInfo(freq, name, full, note_int, str_prefix, repr_prefix), shared
+        between calls for notes 0-127
+    """
+    # Only true ints index the table; floats such as 69.0 would pass the range check
+    if type(midi_note) is int and 0 <= midi_note < 128:
+        return _TABLE[midi_note]
+    return _note_info(midi_note)
 
 
 def midi_to_frequency(midi_note: int) -> float:
@@ -12,12 +68,15 @@ def midi_to_frequency(midi_note: int) -> float:
     where MIDI note 69 corresponds to A4 (440 Hz).
     
     Args:
-        midi_note: MIDI note number (0-127)
+        midi_note: MIDI note number (0-127; other values, such as notes of
+            negative valve indices or fractional notes, are computed directly)
     
     Returns:
         Frequency in Hertz
     """
-    return 440.0 * math.pow(2, (midi_note - 69) / 12.0)
+    if type(midi_note) is int and 0 <= midi_note < 128:
+        return _TABLE[midi_note].freq
+    return _frequency(midi_note)
 
 
 def midi_to_note_name(midi_note: int) -> Tuple[str, str]:
@@ -32,12 +91,8 @@ def midi_to_note_name(midi_note: int) -> Tuple[str, str]:
         - note_name: Note without octave (e.g., "A#", "C", "F#")
         - note_full: Note with octave (e.g., "A4", "C#5", "F3")
     """
-    note_names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-    octave = (midi_note // 12) - 1
-    note_index = midi_note % 12
-    note_name = note_names[note_index]
-    note_full = f"{note_name}{octave}"
-    return note_name, note_full
+    info = midi_info(midi_note)
+    return info.name, info.full
 
 
 def midi_to_note_int(midi_note: int) -> int:
@@ -55,6 +110,8 @@ def midi_to_note_int(midi_note: int) -> int:
     Returns:
         Integer representation (0-11)
     """
+    if type(midi_note) is int and 0 <= midi_note < 128:
+        return _TABLE[midi_note].note_int
     return (midi_note - 21) % 12
 
 
@@ -73,3 +130,40 @@ def ticks_to_seconds(ticks: int, tempo_us: int, ticks_per_beat: int) -> float:
         Duration in seconds
     """
     return (ticks * tempo_us) / (ticks_per_beat * 1_000_000)
+
+
+def ticks_array_to_seconds(ticks: Sequence[int], tempo_ticks: Sequence[int], tempos: Sequence[int],
+                           ticks_per_beat: int) -> "np.ndarray":
+    """
+    Convert many absolute tick positions to absolute seconds at once (requires numpy).
+    
+    Vectorized counterpart of walking the tempo map per tick: the active tempo of
+    every tick is found with np.searchsorted and the time is the tempo segment's
+    start time plus ticks_to_seconds() of the remainder. The first tempo also
+    applies before its own tick. Gives the same floats as the scalar helpers.
+    
+    Args:
+        ticks: Absolute tick positions (any order)
+        tempo_ticks: Ticks of the tempo changes, ascending
+        tempos: Tempo in microseconds per beat from each of tempo_ticks on
+        ticks_per_beat: MIDI ticks per beat (resolution)
+    
+    Returns:
+        float64 array of absolute times in seconds, parallel to ticks
+    """
+    ticks = np.asarray(ticks, dtype=np.int64)
+    tempo_ticks = np.asarray(tempo_ticks, dtype=np.int64)
+    tempos = np.asarray(tempos, dtype=np.int64)
+    scale = ticks_per_beat * 1_000_000
+    
+    # Absolute time at each tempo change; the segment before it runs at the previous tempo
+    segment_ticks = np.diff(tempo_ticks, prepend=0)
+    segment_tempos = np.concatenate((tempos[:1], tempos[:-1]))
+    boundary_times = np.cumsum(segment_ticks * segment_tempos / scale)
+    
+    idx = np.searchsorted(tempo_ticks, ticks, side="right") - 1
+    before_first = idx < 0
+    idx[before_first] = 0
+    base_ticks = np.where(before_first, 0, tempo_ticks[idx])
+    base_times = np.where(before_first, 0.0, boundary_times[idx])
+    return base_times + (ticks - base_ticks) * tempos[idx] / scale
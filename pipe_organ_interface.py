@@ -1,7 +1,9 @@
 import math
+import os
 import threading
 import time
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
 
 try:
     import numpy as np  # type: ignore
@@ -15,11 +17,30 @@ except Exception:  # pragma: no cover - optional dependency
     sd = None  # type: ignore
     _SD_OK = False
 
-from miditones.utils import midi_to_frequency
+from miditones.utils import _TABLE as _NOTE_TABLE, midi_to_frequency
+from pipe_organ_mixer import mix_wavetable
 
 # Valve 0 is C3 (MIDI note 48). Negative valves are allowed.
 BASE_MIDI_FOR_VALVE_ZERO = 48
 
+# Voices the mixer buffers are sized for up front; they grow if more sound at once.
+MAX_VOICES = 64
+
+# From this many voices the compiled mixer splits a block across worker threads
+# (it releases the GIL). Handing a group of voices to a thread costs tens of
+# microseconds, about what the kernel itself needs for this many voices.
+PARALLEL_MIX_MIN_VOICES = 64
+
+# One sine cycle sampled at a power-of-two size, so wrapping an index is a bit mask.
+_SINE_TABLE_SIZE = 4096
+# Phase angle of one wavetable entry; positions and increments are kept in table entries.
+_RADIANS_PER_ENTRY = 2 * math.pi / _SINE_TABLE_SIZE
+_SINE_LUT = (
+    np.sin(_RADIANS_PER_ENTRY * np.arange(_SINE_TABLE_SIZE)).astype(np.float32)
+    if np is not None
+    else None
+)
+
 
 class PipeOrgan:
     """Simulated pipe organ with optional audio via sounddevice.
@@ -40,11 +61,48 @@ class PipeOrgan:
         self._volume = max(0.0, min(volume, 1.0))
         self._use_audio = bool(use_audio and _SD_OK and np is not None)
         self._ramp_samples = max(1, int(max(0.0, ramp_duration) * self._sample_rate))
+        # Wavetable increment per sample for a 1 Hz voice; a voice's increment is freq times this.
+        self._entries_per_hz = _SINE_TABLE_SIZE / float(self._sample_rate)
 
-        self._voices: Dict[int, Dict[str, float]] = {}
+        # Sounding voices as parallel arrays (one slot per voice). Slots
+        # [0, _voice_count) are in use; finished voices are swapped with the last.
+        self._voice_count = 0
+        self._slots: Dict[int, int] = {}  # valve index -> slot
+        self._slot_valves: List[int] = []  # slot -> valve index
+        # Set whenever the slot layout changes, so the callback knows its copy
+        # of the per-voice increments is stale.
+        self._voices_dirty = True
+        self._advance_frames = 0
         self._lock = threading.Lock()
-        self._phase = 0
         self._stream = None
+        # Threads mixing voice groups in parallel (compiled mixer only), started
+        # once the audio stream is running; see _start_mix_pool().
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        self._mix_workers = min(4, cpus)
+        self._mix_pool = None
+
+        # Mixer scratch space, preallocated so the audio callback rarely allocates.
+        if np is not None:
+            self._position = np.zeros(MAX_VOICES, dtype=np.float64)  # wavetable read position
+            self._increment = np.zeros(MAX_VOICES, dtype=np.float64)  # table entries per sample
+            self._gain = np.zeros(MAX_VOICES, dtype=np.float32)
+            self._target = np.zeros(MAX_VOICES, dtype=np.float32)
+            self._basis = np.empty((2 * MAX_VOICES, 0), dtype=np.float32)
+            self._weights = np.empty((2, 2 * MAX_VOICES), dtype=np.float32)
+            self._mix_rows = np.empty((2, 0), dtype=np.float32)
+            self._theta_arr = np.empty(MAX_VOICES, dtype=np.float64)
+            self._scratch_frames = 0  # frame capacity of _basis and _mix_rows
+            self._basis_stale = True
+            self._basis_frames = 0
+            self._positions_arr = np.empty(MAX_VOICES, dtype=np.float64)
+            self._increments_arr = np.empty(MAX_VOICES, dtype=np.float64)
+            self._gains_arr = np.empty(MAX_VOICES, dtype=np.float32)
+            self._deltas_arr = np.empty(MAX_VOICES, dtype=np.float32)
+            self._advance_arr = np.empty(MAX_VOICES, dtype=np.float64)
+            self._arange = np.empty(0, dtype=np.float32)
+            self._fraction = np.empty(0, dtype=np.float32)
+            self._fraction_frames = 0
+            self._partials = np.empty((self._mix_workers, 0), dtype=np.float32)
 
         if self._use_audio:
             try:
@@ -58,6 +116,8 @@ class PipeOrgan:
             except Exception as exc:
                 print(f"Audio disabled (sounddevice stream init failed): {exc}")
                 self._use_audio = False
+            else:
+                self._start_mix_pool()
         else:
             if use_audio and not _SD_OK:
                 print("Audio disabled: sounddevice not available")
@@ -66,68 +126,291 @@ class PipeOrgan:
 
 
 
+    def _start_mix_pool(self) -> None:
+        """Start the worker threads for parallel mixing, if they can be used.
+
+        Runs on the constructing thread, so the audio callback never spawns a
+        thread and the workers don't inherit its scheduling. Until the pool
+        exists the callback simply mixes on its own thread.
+        """
+        if mix_wavetable is None or self._mix_workers < 2 or self._mix_pool is not None:
+            return
+        pool = ThreadPoolExecutor(max_workers=self._mix_workers - 1, thread_name_prefix="organ-mix")
+        # The executor starts a thread per submit() while none is idle; holding every
+        # task at a barrier makes it start all of them now.
+        started = threading.Barrier(self._mix_workers)
+        for _ in range(self._mix_workers - 1):
+            pool.submit(started.wait)
+        started.wait()
+        self._mix_pool = pool
+
     def _sd_callback(self, outdata, frames, time_info, status):  # type: ignore[override]
-        if not self._voices or np is None:
+        if not self._voice_count or np is None:
             outdata.fill(0)
             return
 
-        t = (np.arange(frames, dtype=np.float32) + self._phase) / float(self._sample_rate)
-        signal = np.zeros(frames, dtype=np.float32)
         ramp_step = 1.0 / float(self._ramp_samples)
+        max_delta = ramp_step * frames
 
         with self._lock:
-            voice_count = max(1, len(self._voices))
-            to_remove = []
+            # Drop voices that are silent and closed (faded out during the previous
+            # block, or closed before they ever sounded) before they reach the mixer;
+            # the quietest voice tells whether there are any.
+            voice_count = self._voice_count
+            gain = self._gain[:voice_count]
+            if voice_count and gain[gain.argmin()] <= 1e-4:
+                finished = np.flatnonzero((self._target[:voice_count] == 0.0) & (gain <= 1e-4))
+                for slot in finished[::-1]:
+                    self._remove_voice(int(slot))
+                voice_count = self._voice_count
+
+            if voice_count == 0:
+                outdata.fill(0)
+                return
+            self._ensure_scratch(voice_count, frames)
+            position = self._position[:voice_count]
+            gain = self._gain[:voice_count]
+            positions = self._positions_arr[:voice_count]
+            increments = self._increments_arr[:voice_count]
+            gains = self._gains_arr[:voice_count]
+            deltas = self._deltas_arr[:voice_count]
 
-            for valve, voice in self._voices.items():
-                freq = voice["freq"]
-                gain = voice["gain"]
-                target = voice["target"]
+            # Increments only change with the set of voices; refresh them (and the
+            # per-block advance) when a voice came or went, or the block size changed.
+            if self._voices_dirty or frames != self._advance_frames:
+                increments[:] = self._increment[:voice_count]
+                np.multiply(increments, frames, out=self._advance_arr[:voice_count])
+                self._advance_frames = frames
+                self._voices_dirty = False
+                self._basis_stale = True
 
-                max_delta = ramp_step * frames
-                delta = max(-max_delta, min(max_delta, target - gain))
-                end_gain = gain + delta
-                gain_ramp = np.linspace(gain, end_gain, frames, endpoint=False, dtype=np.float32)
+            # Snapshot this block's start state, then advance the voices past it.
+            if voice_count == 1:
+                # Solo line: plain float arithmetic beats a run of one-element array operations.
+                start_position = float(position[0])
+                start_gain = float(gain[0])
+                delta = max(-max_delta, min(max_delta, float(self._target[0]) - start_gain))
+                positions[0] = start_position
+                gains[0] = start_gain
+                deltas[0] = delta
+                position[0] = (start_position + float(self._advance_arr[0])) % _SINE_TABLE_SIZE
+                gain[0] = start_gain + delta
+            else:
+                positions[:] = position
+                gains[:] = gain
+                np.subtract(self._target[:voice_count], gain, out=deltas)
+                np.minimum(deltas, max_delta, out=deltas)
+                np.maximum(deltas, -max_delta, out=deltas)
+                # Keeping the position within one table length keeps it precise.
+                position += self._advance_arr[:voice_count]
+                np.fmod(position, _SINE_TABLE_SIZE, out=position)
+                gain += deltas
 
-                signal += np.sin(2 * math.pi * freq * t).astype(np.float32) * gain_ramp
-                voice["gain"] = end_gain
-                if target == 0.0 and end_gain <= 1e-4:
-                    to_remove.append(valve)
+        # The lock only covers the O(voices) copy above. The arrays are private to
+        # the audio thread, so mixing runs unlocked (and, compiled, without the GIL)
+        # while valve_open/valve_close proceed on the control thread. Voices are
+        # mixed in slot order: neither mixer evaluates sin per sample, so ordering
+        # them by frequency does not make them faster.
+        signal = outdata[:, 0]
+        if mix_wavetable is not None:
+            if voice_count >= PARALLEL_MIX_MIN_VOICES and self._mix_pool is not None:
+                self._mix_parallel(positions, increments, gains, deltas, signal)
+            else:
+                mix_wavetable(_SINE_LUT, positions, increments, gains, deltas, signal)
+        else:
+            self._mix_numpy(positions, increments, gains, deltas, signal)
+        if voice_count == 1:
+            signal *= self._volume
+        else:
+            signal *= (self._volume / voice_count)
 
-            for valve in to_remove:
-                self._voices.pop(valve, None)
+    def _mix_numpy(self, positions, increments, gains, deltas, signal) -> None:
+        """Sum the voices as rotating phasors; the NumPy path used without numba.
 
-        signal *= (self._volume / voice_count)
-        outdata[:, 0] = signal
-        self._phase = (self._phase + frames) % self._sample_rate
+        Voice v at sample k is sin(theta_v + k * w_v), which expands to
+        sin(theta_v) * cos(k * w_v) + cos(theta_v) * sin(k * w_v). The
+        cos/sin(k * w_v) rows depend only on the voice frequencies and the block
+        size, so they are cached; each block is then one small matrix product of
+        per-voice start phase and gain with those rows, with no per-sample sine
+        or table lookup, and the output is an exact sine.
+        """
+        voice_count = len(positions)
+        frames = len(signal)
+        basis = self._rotation_basis(increments, frames)
 
-    def valve_open(self, valve_index: int):
-        midi_note = BASE_MIDI_FOR_VALVE_ZERO + valve_index
-        freq = midi_to_frequency(midi_note)
+        # weights[0] = gain * (sin theta, cos theta); weights[1] = delta * (sin theta, cos theta)
+        theta = self._theta_arr[:voice_count]
+        np.multiply(positions, _RADIANS_PER_ENTRY, out=theta)
+        weights = self._weights[:, :2 * voice_count]
+        start_phasor = weights[0].reshape(2, voice_count)
+        np.sin(theta, out=start_phasor[0])
+        np.cos(theta, out=start_phasor[1])
 
-        if self._use_audio:
-            with self._lock:
-                voice = self._voices.get(valve_index)
-                if voice:
-                    voice["target"] = 1.0
-                else:
-                    self._voices[valve_index] = {"freq": freq, "gain": 0.0, "target": 1.0}
+        # Scale each voice by its linear gain ramp across the block: gain + delta * k / frames.
+        # Voices that have settled need only their gain.
+        if deltas.any():
+            np.multiply(start_phasor, deltas, out=weights[1].reshape(2, voice_count))
+            start_phasor *= gains
+            rows = self._mix_rows[:, :frames]
+            np.matmul(weights, basis, out=rows)
+            np.multiply(rows[1], self._ramp_fraction(frames), out=signal)
+            signal += rows[0]
+        else:
+            start_phasor *= gains
+            np.matmul(weights[0], basis, out=signal)
+
+    def _mix_parallel(self, positions, increments, gains, deltas, signal) -> None:
+        """Mix contiguous voice groups concurrently with the compiled kernel and sum them.
+
+        The calling thread mixes the first group into ``signal`` itself while the
+        pool mixes the others into preallocated partial buffers.
+        """
+        workers = self._mix_workers
+        frames = len(signal)
+        if self._partials.shape[1] < frames:
+            self._partials = np.empty((workers, max(2 * self._partials.shape[1], frames)), dtype=np.float32)
+
+        bounds = [len(positions) * i // workers for i in range(workers + 1)]
+        futures = [
+            self._mix_pool.submit(
+                mix_wavetable, _SINE_LUT, positions[lo:hi], increments[lo:hi], gains[lo:hi],
+                deltas[lo:hi], self._partials[group, :frames],
+            )
+            for group, (lo, hi) in enumerate(zip(bounds[1:-1], bounds[2:]), start=1)
+        ]
+        hi = bounds[1]
+        mix_wavetable(_SINE_LUT, positions[:hi], increments[:hi], gains[:hi], deltas[:hi], signal)
+        for group, future in enumerate(futures, start=1):
+            future.result()
+            signal += self._partials[group, :frames]
+
+    def _rotation_basis(self, increments, frames: int):
+        """cos(k * w_v) rows followed by sin(k * w_v) rows, rebuilt when voices or block size change."""
+        voice_count = len(increments)
+        if self._basis_stale or frames != self._basis_frames:
+            # Allocates, but only when a voice starts or stops or the block size changes.
+            steps = np.multiply.outer(increments * _RADIANS_PER_ENTRY, np.arange(frames))
+            np.cos(steps, out=self._basis[:voice_count, :frames])
+            np.sin(steps, out=self._basis[voice_count:2 * voice_count, :frames])
+            self._basis_stale = False
+            self._basis_frames = frames
+        return self._basis[:2 * voice_count, :frames]
+
+    def _remove_voice(self, slot: int) -> None:
+        """Drop the voice in ``slot`` by moving the last voice into it (lock held)."""
+        last = self._voice_count - 1
+        del self._slots[self._slot_valves[slot]]
+        if slot != last:
+            for column in (self._position, self._increment, self._gain, self._target):
+                column[slot] = column[last]
+            moved = self._slot_valves[last]
+            self._slot_valves[slot] = moved
+            self._slots[moved] = slot
+        self._slot_valves.pop()
+        self._voice_count = last
+        self._voices_dirty = True
+
+    def _add_voice(self, valve_index: int, increment: float) -> None:
+        """Start a silent voice ramping up to full gain (lock held)."""
+        slot = self._voice_count
+        if slot == len(self._position):
+            size = 2 * slot
+            for name in ("_position", "_increment", "_gain", "_target"):
+                column = getattr(self, name)
+                grown = np.zeros(size, dtype=column.dtype)
+                grown[:slot] = column
+                setattr(self, name, grown)
+        self._position[slot] = 0.0
+        self._increment[slot] = increment
+        self._gain[slot] = 0.0
+        self._target[slot] = 1.0
+        self._slots[valve_index] = slot
+        self._slot_valves.append(valve_index)
+        self._voice_count = slot + 1
+        self._voices_dirty = True
+
+    def _ensure_scratch(self, voice_count: int, frames: int) -> None:
+        """Grow the preallocated mixer buffers to hold voice_count x frames.
+
+        Buffers at least double when they grow, so a block size that creeps up
+        (sounddevice picks it with blocksize=0) reallocates only a few times.
+        """
+        rows, cols = len(self._positions_arr), self._scratch_frames
+        if voice_count > rows or frames > cols:
+            if voice_count > rows:
+                rows = max(2 * rows, voice_count)
+            if frames > cols:
+                cols = max(2 * cols, frames)
+            if mix_wavetable is None:
+                self._basis = np.empty((2 * rows, cols), dtype=np.float32)
+                self._weights = np.empty((2, 2 * rows), dtype=np.float32)
+                self._theta_arr = np.empty(rows, dtype=np.float64)
+                self._mix_rows = np.empty((2, cols), dtype=np.float32)
+                self._basis_stale = True
+            self._scratch_frames = cols
+        if voice_count > len(self._positions_arr):
+            self._positions_arr = np.empty(rows, dtype=np.float64)
+            self._increments_arr = np.empty(rows, dtype=np.float64)
+            self._voices_dirty = True
+            self._gains_arr = np.empty(rows, dtype=np.float32)
+            self._deltas_arr = np.empty(rows, dtype=np.float32)
+            self._advance_arr = np.empty(rows, dtype=np.float64)
+
+    def _sample_index(self, frames: int):
+        """0, 1, ..., frames - 1, as a view of a buffer kept across block sizes."""
+        if len(self._arange) < frames:
+            size = max(2 * len(self._arange), frames)
+            self._arange = np.arange(size, dtype=np.float32)
+            self._fraction = np.empty(size, dtype=np.float32)
+            self._fraction_frames = 0
+        return self._arange[:frames]
+
+    def _ramp_fraction(self, frames: int):
+        """k / frames for k in [0, frames), recomputed in place when the block size changes."""
+        sample_index = self._sample_index(frames)
+        fraction = self._fraction[:frames]
+        if self._fraction_frames != frames:
+            np.divide(sample_index, np.float32(frames), out=fraction)
+            self._fraction_frames = frames
+        return fraction
+
+    def valve_open(self, valve_index: int):
+        self.valve_update(((valve_index, True),))
 
     def valve_close(self, valve_index: int):
-        if self._use_audio:
-            with self._lock:
-                voice = self._voices.get(valve_index)
-                if voice:
-                    voice["target"] = 0.0
+        self.valve_update(((valve_index, False),))
+
+    def valve_update(self, events: Iterable[Tuple[int, bool]]):
+        """Apply several (valve_index, is_open) changes under one lock acquisition.
+
+        Opening or closing a chord this way contends with the audio callback
+        once instead of once per valve.
+        """
+        if not self._use_audio:
+            return
+        with self._lock:
+            for valve_index, is_open in events:
+                slot = self._slots.get(valve_index)
+                if slot is not None:
+                    self._target[slot] = 1.0 if is_open else 0.0
+                elif is_open:
+                    midi_note = BASE_MIDI_FOR_VALVE_ZERO + valve_index
+                    if type(midi_note) is int and 0 <= midi_note < 128:
+                        freq = _NOTE_TABLE[midi_note].freq
+                    else:
+                        freq = midi_to_frequency(midi_note)
+                    self._add_voice(valve_index, freq * self._entries_per_hz)
 
     def close_all(self):
         if self._use_audio:
             with self._lock:
-                for voice in self._voices.values():
-                    voice["target"] = 0.0
+                self._target[:self._voice_count] = 0.0
             time.sleep(self._ramp_samples / float(self._sample_rate))
             with self._lock:
-                self._voices.clear()
+                self._voice_count = 0
+                self._slots.clear()
+                self._slot_valves.clear()
+                self._voices_dirty = True
         if self._stream is not None:
             try:
                 self._stream.stop()
@@ -135,6 +418,9 @@ class PipeOrgan:
             except Exception:
                 pass
             self._stream = None
+        if self._mix_pool is not None:
+            self._mix_pool.shutdown(wait=False)
+            self._mix_pool = None
 
     def __del__(self):
         try:
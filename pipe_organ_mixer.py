@@ -0,0 +1,50 @@
+"""Compiled voice mixer for the simulated pipe organ (optional, needs numba).
+
+`mix_wavetable` is None when numba is not installed; PipeOrgan then mixes with
+plain NumPy array operations instead.
+"""
+
+try:
+    from numba import njit  # type: ignore
+    from numba import float32, float64, void  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    njit = None  # type: ignore
+
+
+def _mix_wavetable(table, positions, increments, gains, deltas, out):
+    """Sum wavetable voices with linear gain ramps into ``out``.
+
+    For each voice v, sample i reads ``table[int(positions[v] + i * increments[v]) & mask]``
+    (positions and increments in table entries) and is scaled by
+    ``gains[v] + deltas[v] * i / frames``. ``out`` is overwritten.
+    """
+    frames = out.shape[0]
+    mask = table.shape[0] - 1
+    inv_frames = 1.0 / frames
+
+    for i in range(frames):
+        out[i] = 0.0
+
+    for v in range(positions.shape[0]):
+        position = positions[v]
+        increment = increments[v]
+        gain = gains[v]
+        gain_step = deltas[v] * inv_frames
+        for i in range(frames):
+            out[i] += table[int(position) & mask] * gain
+            position += increment
+            gain += gain_step
+
+
+if njit is not None:
+    # Explicit signature: compiled once at import (and cached on disk), never in the audio callback.
+    # nogil lets the control thread run Python while the audio thread mixes.
+    mix_wavetable = njit(
+        void(float32[::1], float64[::1], float64[::1], float32[::1], float32[::1], float32[:]),
+        cache=True,
+        nogil=True,
+        fastmath=True,
+        boundscheck=False,
+    )(_mix_wavetable)
+else:
+    mix_wavetable = None
@@ -0,0 +1,120 @@
+"""Timing helpers shared by the example players.
+
+Playback schedules are expressed as absolute deadlines on the monotonic clock.
+On Linux the wait is done with ``clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME)``
+so the kernel wakes us at the deadline itself instead of after a relative
+interval computed a few microseconds earlier; other platforms fall back to
+``time.sleep``. The last millisecond before each deadline is busy-waited.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import sys
+import time
+from typing import Optional
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+_TIMER_ABSTIME = 1
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        return None
+
+
+def _load_clock_nanosleep():
+    if _libc is None or not hasattr(time, "CLOCK_MONOTONIC"):
+        return None
+    try:
+        func = _libc.clock_nanosleep
+    except AttributeError:
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.POINTER(_Timespec), ctypes.c_void_p]
+    func.restype = ctypes.c_int
+    return func
+
+
+_libc = _load_libc()
+_clock_nanosleep = _load_clock_nanosleep()
+
+# Clock used for playback deadlines. On Linux CPython reads CLOCK_MONOTONIC here,
+# the same clock clock_nanosleep is given.
+monotonic = time.monotonic
+
+# Final stretch before a deadline that is busy-waited instead of slept: the OS
+# scheduler cannot reliably honour sleeps this short.
+SPIN_WINDOW = 0.001
+
+
+def sleep_until(deadline: float, spin: float = SPIN_WINDOW) -> None:
+    """Block until the monotonic clock reaches ``deadline`` (seconds).
+
+    Sleeps until ``spin`` seconds before the deadline, then spins on the clock
+    for the remainder, trading up to ``spin`` seconds of CPU per call for
+    sub-millisecond accuracy.
+    """
+    if _clock_nanosleep is not None:
+        coarse = deadline - spin
+        sec = int(coarse)
+        ts = _Timespec(sec, int((coarse - sec) * 1_000_000_000))
+        # clock_nanosleep returns the error number directly; retry on signals.
+        while _clock_nanosleep(time.CLOCK_MONOTONIC, _TIMER_ABSTIME, ctypes.byref(ts), None) == errno.EINTR:
+            pass
+    else:
+        remaining = deadline - monotonic()
+        while remaining > 2 * spin:
+            time.sleep(remaining - spin)
+            remaining = deadline - monotonic()
+
+    while monotonic() < deadline:
+        pass
+
+
+def enable_realtime(priority: int = 20, cpu: Optional[int] = None) -> bool:
+    """Prepare the calling thread for low-jitter playback (Linux only).
+
+    Switches the thread to SCHED_FIFO at ``priority``, locks current and future
+    memory with mlockall so playback never waits on a page fault, and pins the
+    thread to ``cpu`` (default: the highest CPU it may run on). Each step is
+    best effort; failures, typically from missing privileges, print a warning.
+    Threads started afterwards inherit these settings, so start helpers first.
+
+    Returns:
+        True if every step succeeded.
+    """
+    if not sys.platform.startswith("linux"):
+        print("Realtime mode is only supported on Linux; using normal scheduling")
+        return False
+
+    ok = True
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except OSError as exc:
+        print(f"Warning: could not enable SCHED_FIFO scheduling: {exc}")
+        ok = False
+
+    if _libc is None or _libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) != 0:
+        err = ctypes.get_errno()
+        print(f"Warning: could not lock memory: {os.strerror(err) if err else 'mlockall unavailable'}")
+        ok = False
+
+    try:
+        target = max(os.sched_getaffinity(0)) if cpu is None else cpu
+        os.sched_setaffinity(0, {target})
+    except OSError as exc:
+        print(f"Warning: could not pin playback to a CPU: {exc}")
+        ok = False
+
+    return ok
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Test script comparing the optional fast paths with their pure Python fallbacks."""
+
+import os
+import random
+import tempfile
+
+import mido
+
+from miditones import Midi, parser
+from miditones.utils import np, ticks_array_to_seconds
+import example_organ_player
+
+
+def write_test_file(filename):
+    """Write a two-track MIDI file with tempo changes in both tracks."""
+    rng = random.Random(1)
+    midi_file = mido.MidiFile(ticks_per_beat=480)
+    for track_index, channel in enumerate((0, 3)):
+        track = mido.MidiTrack()
+        track.append(mido.MetaMessage("track_name", name=f"Voice {track_index + 1}", time=0))
+        track.append(mido.Message("program_change", program=19, channel=channel, time=0))
+        sounding = []
+        for step in range(400):
+            if step % 37 == 0:
+                tempo = mido.bpm2tempo(rng.choice((60, 90, 120, 133, 200)))
+                track.append(mido.MetaMessage("set_tempo", tempo=tempo, time=0))
+            if sounding and rng.random() < 0.5:
+                note = sounding.pop(rng.randrange(len(sounding)))
+                track.append(mido.Message("note_off", note=note, channel=channel, time=rng.randrange(0, 240)))
+            else:
+                note = rng.randrange(36, 96)
+                sounding.append(note)
+                track.append(mido.Message("note_on", note=note, velocity=rng.randrange(1, 128),
+                                          channel=channel, time=rng.randrange(0, 240)))
+        # A few notes are left sounding to exercise the unclosed-note handling
+        midi_file.tracks.append(track)
+    midi_file.save(filename)
+
+
+def check(label, same):
+    print(f"  {'✓' if same else '✗'} {label}")
+    return same
+
+
+def compare_tick_times(midi_file, tempo_map):
+    """ticks_array_to_seconds() against times_at_ticks()."""
+    tempo_index = parser.build_tempo_index(tempo_map, midi_file.ticks_per_beat)
+    ticks = list(range(0, tempo_map[-1][0] + 2000, 7))
+    fast = ticks_array_to_seconds(ticks, tempo_index[0], tempo_index[1], midi_file.ticks_per_beat).tolist()
+    slow = parser.times_at_ticks(ticks, tempo_index, midi_file.ticks_per_beat)
+    return check("ticks_array_to_seconds matches times_at_ticks",
+                 fast == [slow[tick] for tick in ticks])
+
+
+def compare_note_times(midi_file, tempo_map):
+    """_note_times() with and without numpy."""
+    same = True
+    for midi_track in midi_file.tracks:
+        note_events = parser.scan_track(midi_track)[3]
+        fast = parser._note_times(note_events, tempo_map, midi_file.ticks_per_beat)
+        parser.np = None
+        try:
+            slow = parser._note_times(note_events, tempo_map, midi_file.ticks_per_beat)
+        finally:
+            parser.np = np
+        same = same and fast == slow
+    return check("_note_times matches without numpy", same)
+
+
+def compare_scanners(midi_file):
+    """The compiled scan_track_c() against scan_track()."""
+    scan_track_c = parser._scan_track_c
+    if scan_track_c is None:
+        print("  - compiled scanner not built, skipped")
+        return True
+    fast = [scan_track_c(midi_track) for midi_track in midi_file.tracks]
+    parser._scan_track_c = None
+    try:
+        slow = [parser.scan_track(midi_track) for midi_track in midi_file.tracks]
+    finally:
+        parser._scan_track_c = scan_track_c
+    return check("scan_track_c matches scan_track", fast == slow)
+
+
+def compare_valve_events(song):
+    """build_valve_events() through build_valve_schedule() against the list path."""
+    def summary(events):
+        return [(time, is_open, valve, tone.midi_note, track_name)
+                for time, is_open, valve, tone, track_name in events]
+
+    same = True
+    for track_name in song.list_tracks():
+        for speed, start, stop in ((1.0, 0.0, None), (1.5, 2.0, 20.0), (0.75, 0.0, 11.0)):
+            args = (song[track_name], 0.05, 0.02, speed, start, stop)
+            fast = example_organ_player.build_valve_events(*args)
+            example_organ_player.np = None
+            try:
+                slow = example_organ_player.build_valve_events(*args)
+            finally:
+                example_organ_player.np = np
+            same = same and summary(fast) == summary(slow)
+    return check("build_valve_schedule matches the list path", same)
+
+
+def main():
+    print("Testing MidiTones fast paths against their fallbacks")
+    print("=" * 60)
+
+    if np is None:
+        print("✗ numpy is not installed, nothing to compare")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "multi_tempo.mid")
+        write_test_file(filename)
+        song = Midi(filename)
+        midi_file = mido.MidiFile(filename)
+        tempo_map = parser.merge_tempo_changes(parser.scan_track(midi_track)[4]
+                                               for midi_track in midi_file.tracks)
+        print(f"✓ Generated {len(song.list_tracks())} tracks with {len(tempo_map)} tempo changes")
+        print()
+
+        results = [
+            compare_tick_times(midi_file, tempo_map),
+            compare_note_times(midi_file, tempo_map),
+            compare_scanners(midi_file),
+            compare_valve_events(song),
+        ]
+
+    print()
+    print("=" * 60)
+    if all(results):
+        print("✓ All tests completed successfully!")
+    else:
+        print("✗ Some fast paths differ from their fallbacks")
+
+
+if __name__ == "__main__":
+    main()